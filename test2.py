@@ -1,6 +1,107 @@
+import csv
+import io
 import streamlit as st
-import pandas as pd
 from datetime import datetime
+from functools import lru_cache
+
+# Activity level multipliers for TDEE
+_ACTIVITY_MULT = {
+    'Sedentary': 1.2,          # Little or no exercise
+    'Lightly Active': 1.375,    # Light exercise 1-3 days/week
+    'Moderately Active': 1.55,  # Moderate exercise 3-5 days/week
+    'Very Active': 1.725,       # Heavy exercise 6-7 days/week
+    'Extremely Active': 1.9     # Very heavy exercise, physical job
+}
+
+# Plan templates, filled in with str.format by generate_plan
+_DIET_TARGETS_TPL = """
+Daily Targets:
+- Calories: {calories:.0f} kcal
+- Protein: {protein:.0f}g
+- Carbs: {carbs:.0f}g
+- Fats: {fats:.0f}g
+"""
+
+_DIET_TPL_LOSS = _DIET_TARGETS_TPL + """
+Focus on:
+- High protein foods (lean meat, fish, eggs)
+- Fiber-rich vegetables
+- Complex carbohydrates
+- Limited processed foods
+"""
+
+_DIET_TPL_GAIN = _DIET_TARGETS_TPL + """
+Focus on:
+- High protein foods every 3-4 hours
+- Complex carbohydrates
+- Healthy fats
+- Pre and post-workout nutrition
+"""
+
+_DIET_TPL_MAINTENANCE = _DIET_TARGETS_TPL + """
+Focus on:
+- Balanced macro distribution
+- Whole, unprocessed foods
+- Regular meal timing
+- Adequate hydration
+"""
+
+_DIET_TPL_HEALTH = """
+Focus on:
+- Balanced, nutrient-dense meals
+- Variety of fruits and vegetables
+- Whole grains and lean proteins
+- Mindful eating habits
+"""
+
+_EX_TPL_LOSS = """
+Weekly Schedule:
+- 3-4 days of moderate-intensity cardio (30-45 minutes)
+- 2-3 days of strength training
+- Include rest days for recovery
+"""
+
+_EX_TPL_GAIN = """
+Weekly Schedule:
+- 4-5 days of strength training
+- Focus on compound exercises
+- Progressive overload
+- 1-2 days of light cardio
+- Proper rest between sessions
+"""
+
+_EX_TPL_MAINTENANCE = """
+Weekly Schedule:
+- 3-4 days of strength training
+- 2-3 days of moderate cardio
+- Mix of activities for variety
+- Active recovery days
+"""
+
+_EX_TPL_HEALTH = """
+Weekly Schedule:
+- Daily physical activity
+- Mix of cardio and strength training
+- Focus on enjoyable activities
+- Stay consistent with routine
+"""
+
+# Per-goal plan parameters: (calorie delta, carb share, fat share, diet template, exercise plan).
+# General Health has no macro targets, so its shares are None.
+_GOAL_PARAMS = {
+    'Weight Loss': (-500, 0.40, 0.25, _DIET_TPL_LOSS, _EX_TPL_LOSS),
+    'Muscle Gain': (500, 0.50, 0.25, _DIET_TPL_GAIN, _EX_TPL_GAIN),
+    'Maintenance': (0, 0.45, 0.30, _DIET_TPL_MAINTENANCE, _EX_TPL_MAINTENANCE),
+    'General Health': (0, None, None, _DIET_TPL_HEALTH, _EX_TPL_HEALTH)
+}
+
+# Input checks in the order they are reported: (predicate, error message)
+_INPUT_CHECKS = (
+    (lambda name, age, height, weight: bool(name) and not name.isspace(), "Please enter your name."),
+    (lambda name, age, height, weight: age >= 1, "Please enter a valid age."),
+    (lambda name, age, height, weight: height >= 50, "Please enter a valid height (minimum 50 cm)."),
+    (lambda name, age, height, weight: weight >= 30, "Please enter a valid weight (minimum 30 kg).")
+)
 
 # Initialize session state
 if 'previous_calculations' not in st.session_state:
@@ -8,163 +109,98 @@ if 'previous_calculations' not in st.session_state:
 
 def validate_inputs(name, age, height, weight):
     """Validate user inputs and return error message if invalid."""
-    if not name.strip():
-        return "Please enter your name."
-    if age < 1:
-        return "Please enter a valid age."
-    if height < 50:
-        return "Please enter a valid height (minimum 50 cm)."
-    if weight < 30:
-        return "Please enter a valid weight (minimum 30 kg)."
-    return None
+    return next(
+        (message for is_valid, message in _INPUT_CHECKS if not is_valid(name, age, height, weight)),
+        None
+    )
 
-def calculate_bmr_tdee(weight, height, age, gender, activity_level):
-    """Calculate BMR and TDEE with error handling."""
+def _bmr_tdee_kernel(weight, height, age, is_male, mult):
+    """Mifflin-St Jeor BMR and the matching TDEE for one person."""
+    bmr = 10.0 * weight + 6.25 * height - 5.0 * age + (5.0 if is_male else -161.0)
+    return bmr, bmr * mult
+
+@lru_cache(maxsize=None)
+def _bmr_tdee_fill():
+    """Return the batch loop, JIT-compiled with numba when it is installed."""
     try:
-        # BMR calculation using Mifflin-St Jeor Equation
-        if gender == 'Male':
-            bmr = 10 * weight + 6.25 * height - 5 * age + 5
-        else:
-            bmr = 10 * weight + 6.25 * height - 5 * age - 161
-        
-        # Activity level multipliers for TDEE
-        activity_multipliers = {
-            'Sedentary': 1.2,          # Little or no exercise
-            'Lightly Active': 1.375,    # Light exercise 1-3 days/week
-            'Moderately Active': 1.55,  # Moderate exercise 3-5 days/week
-            'Very Active': 1.725,       # Heavy exercise 6-7 days/week
-            'Extremely Active': 1.9     # Very heavy exercise, physical job
-        }
-        
-        if activity_level not in activity_multipliers:
-            raise ValueError(f"Invalid activity level: {activity_level}")
-            
-        tdee = bmr * activity_multipliers[activity_level]
-        
-        # Validate results
-        if bmr <= 0 or tdee <= 0:
-            raise ValueError("Invalid calculation result")
-            
-        return bmr, tdee
+        from numba import njit, prange  # deferred: only the batch path uses numba
+    except ImportError:  # numba is optional; fall back to plain Python
+        kernel, njit_parallel, prange = _bmr_tdee_kernel, (lambda func: func), range
+    else:
+        kernel, njit_parallel = njit(_bmr_tdee_kernel), njit(parallel=True)
+
+    @njit_parallel
+    def fill(weights, heights, ages, is_male, mults, bmr, tdee):
+        for i in prange(weights.shape[0]):
+            row_bmr, row_tdee = kernel(weights[i], heights[i], ages[i], is_male[i], mults[i])
+            bmr[i] = row_bmr
+            tdee[i] = row_tdee
+
+    return fill
+
+def _bmr_tdee_vec(weights, heights, ages, is_male, mults):
+    """Batch version of _bmr_tdee_kernel over equal-length sequences.
+
+    Inputs may be lists or ndarrays; they are converted to 1-D float/bool
+    ndarrays before calling the kernel. Returns (bmr, tdee) as ndarrays.
+    Raises ValueError if the inputs are not 1-D or differ in length.
+    """
+    import numpy as np  # deferred: only the batch path needs numpy
+    arrays = (
+        np.asarray(weights, dtype=np.float64),
+        np.asarray(heights, dtype=np.float64),
+        np.asarray(ages, dtype=np.float64),
+        np.asarray(is_male, dtype=np.bool_),
+        np.asarray(mults, dtype=np.float64)
+    )
+    n = arrays[0].shape[0] if arrays[0].ndim == 1 else -1
+    if any(arr.ndim != 1 or arr.shape[0] != n for arr in arrays):
+        raise ValueError("Batch inputs must be 1-D sequences of equal length")
+    
+    bmr = np.empty(n)
+    tdee = np.empty(n)
+    _bmr_tdee_fill()(*arrays, bmr, tdee)
+    return bmr, tdee
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def calculate_bmr_tdee(weight, height, age, gender, activity_level):
+    """Calculate BMR and TDEE. Raises ValueError on invalid input."""
+    if activity_level not in _ACTIVITY_MULT:
+        raise ValueError(f"Invalid activity level: {activity_level}")
+    
+    # BMR calculation using Mifflin-St Jeor Equation
+    bmr, tdee = _bmr_tdee_kernel(
+        float(weight), float(height), float(age), gender == 'Male', _ACTIVITY_MULT[activity_level]
+    )
+    
+    # Validate results
+    if bmr <= 0 or tdee <= 0:
+        raise ValueError("Invalid calculation result")
         
-    except Exception as e:
-        st.error(f"Error in calculations: {str(e)}")
-        return None, None
+    return bmr, tdee
 
+@st.cache_data(show_spinner=False, max_entries=256)
 def generate_plan(goals, tdee, weight):
     """Generate personalized diet and exercise plan."""
-    try:
-        if tdee is None:
-            return 0, "Unable to generate diet plan.", "Unable to generate exercise plan."
-        
-        protein_needs = weight * 2.2  # Protein needs in grams (2.2g per kg)
-        
-        if goals == 'Weight Loss':
-            calories = max(1200, tdee - 500)  # Minimum 1200 calories
-            macros = {
-                'protein': protein_needs,
-                'carbs': (calories * 0.40) / 4,  # 40% carbs
-                'fats': (calories * 0.25) / 9    # 25% fats
-            }
-            diet_plan = f"""
-            Daily Targets:
-            - Calories: {calories:.0f} kcal
-            - Protein: {macros['protein']:.0f}g
-            - Carbs: {macros['carbs']:.0f}g
-            - Fats: {macros['fats']:.0f}g
-            
-            Focus on:
-            - High protein foods (lean meat, fish, eggs)
-            - Fiber-rich vegetables
-            - Complex carbohydrates
-            - Limited processed foods
-            """
-            exercise_plan = """
-            Weekly Schedule:
-            - 3-4 days of moderate-intensity cardio (30-45 minutes)
-            - 2-3 days of strength training
-            - Include rest days for recovery
-            """
-            
-        elif goals == 'Muscle Gain':
-            calories = tdee + 500
-            macros = {
-                'protein': protein_needs,
-                'carbs': (calories * 0.50) / 4,  # 50% carbs
-                'fats': (calories * 0.25) / 9    # 25% fats
-            }
-            diet_plan = f"""
-            Daily Targets:
-            - Calories: {calories:.0f} kcal
-            - Protein: {macros['protein']:.0f}g
-            - Carbs: {macros['carbs']:.0f}g
-            - Fats: {macros['fats']:.0f}g
-            
-            Focus on:
-            - High protein foods every 3-4 hours
-            - Complex carbohydrates
-            - Healthy fats
-            - Pre and post-workout nutrition
-            """
-            exercise_plan = """
-            Weekly Schedule:
-            - 4-5 days of strength training
-            - Focus on compound exercises
-            - Progressive overload
-            - 1-2 days of light cardio
-            - Proper rest between sessions
-            """
-            
-        elif goals == 'Maintenance':
-            calories = tdee
-            macros = {
-                'protein': protein_needs,
-                'carbs': (calories * 0.45) / 4,  # 45% carbs
-                'fats': (calories * 0.30) / 9    # 30% fats
-            }
-            diet_plan = f"""
-            Daily Targets:
-            - Calories: {calories:.0f} kcal
-            - Protein: {macros['protein']:.0f}g
-            - Carbs: {macros['carbs']:.0f}g
-            - Fats: {macros['fats']:.0f}g
-            
-            Focus on:
-            - Balanced macro distribution
-            - Whole, unprocessed foods
-            - Regular meal timing
-            - Adequate hydration
-            """
-            exercise_plan = """
-            Weekly Schedule:
-            - 3-4 days of strength training
-            - 2-3 days of moderate cardio
-            - Mix of activities for variety
-            - Active recovery days
-            """
-            
-        else:  # General Health
-            calories = tdee
-            diet_plan = """
-            Focus on:
-            - Balanced, nutrient-dense meals
-            - Variety of fruits and vegetables
-            - Whole grains and lean proteins
-            - Mindful eating habits
-            """
-            exercise_plan = """
-            Weekly Schedule:
-            - Daily physical activity
-            - Mix of cardio and strength training
-            - Focus on enjoyable activities
-            - Stay consistent with routine
-            """
-        
-        return calories, diet_plan, exercise_plan
-        
-    except Exception as e:
-        st.error(f"Error generating plan: {str(e)}")
-        return tdee, "Error generating diet plan.", "Error generating exercise plan."
+    if tdee is None:
+        return 0, "Unable to generate diet plan.", "Unable to generate exercise plan."
+    
+    delta, carb_pct, fat_pct, diet_tpl, exercise_plan = _GOAL_PARAMS.get(goals, _GOAL_PARAMS['General Health'])
+    calories = tdee + delta
+    if goals == 'Weight Loss':
+        calories = max(1200, calories)  # Minimum 1200 calories
+    
+    if carb_pct is None:
+        diet_plan = diet_tpl
+    else:
+        diet_plan = diet_tpl.format(
+            calories=calories,
+            protein=weight * 2.2,  # Protein needs in grams (2.2g per kg)
+            carbs=(calories * carb_pct) / 4,
+            fats=(calories * fat_pct) / 9
+        )
+    
+    return calories, diet_plan, exercise_plan
 
 def create_download_data(user_data, calculations, plans):
     """Create formatted data for download."""
@@ -189,6 +225,11 @@ def create_download_data(user_data, calculations, plans):
         }
     }
 
+def _history_df(calculations):
+    """Build the previous-calculations table."""
+    import pandas as pd  # deferred: only needed once there is history to show
+    return pd.DataFrame(calculations)
+
 def app():
     """Main Streamlit application."""
     st.set_page_config(page_title="Fitness Planner", layout="wide")
@@ -227,81 +268,96 @@ def app():
 
         submit_button = st.form_submit_button("Generate Plan")
 
-    if submit_button:
-        # Validate inputs
-        error_message = validate_inputs(name, age, height, weight)
-        if error_message:
-            st.error(error_message)
-            return
+    # Nothing below depends on widget changes until the form is submitted
+    if not submit_button:
+        st.stop()
 
-        # Calculate BMR and TDEE
+    # Validate inputs
+    error_message = validate_inputs(name, age, height, weight)
+    if error_message:
+        st.error(error_message)
+        return
+
+    # Calculate BMR and TDEE
+    try:
         bmr, tdee = calculate_bmr_tdee(weight, height, age, gender, activity_level)
-        
-        if bmr is not None and tdee is not None:
-            # Generate the personalized plan
+    except Exception as e:
+        st.error(f"Error in calculations: {str(e)}")
+        bmr, tdee = None, None
+    
+    if bmr is not None and tdee is not None:
+        # Generate the personalized plan
+        try:
             calories, diet_plan, exercise_plan = generate_plan(goals, tdee, weight)
-            
-            # Store calculation in session state
-            calculation = {
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'name': name,
-                'bmr': bmr,
-                'tdee': tdee,
-                'goal': goals,
-                'calories': calories
-            }
-            st.session_state.previous_calculations.append(calculation)
-            
-            # Display Results
-            st.header(f"👋 Hello, {name}!")
-            
-            # Create three columns for displaying results
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("BMR", f"{bmr:.0f} kcal/day")
-            with col2:
-                st.metric("TDEE", f"{tdee:.0f} kcal/day")
-            with col3:
-                st.metric("Target Calories", f"{calories:.0f} kcal/day")
-            
-            # Display detailed plans
-            st.subheader("🍽️ Diet Plan")
-            st.markdown(diet_plan)
-            
-            st.subheader("💪 Exercise Plan")
-            st.markdown(exercise_plan)
-            
-            st.subheader("😴 Sleep & Meal Schedule")
-            st.write(f"- Recommended sleep: {sleep_hours} hours per night")
-            st.write(f"- Planned meals: {meals_per_day} per day")
-            
-            # Create download data
-            plan_data = create_download_data(
-                user_data={'name': name, 'age': age, 'gender': gender, 'height': height, 
-                          'weight': weight, 'activity_level': activity_level, 'goals': goals},
-                calculations={'bmr': bmr, 'tdee': tdee, 'calories': calories},
-                plans={'diet': diet_plan, 'exercise': exercise_plan}
-            )
-            
-            # Convert to DataFrame for download
-            df = pd.DataFrame([plan_data])
-            csv = df.to_csv(index=False).encode('utf-8')
-            
-            st.download_button(
-                label="📥 Download Your Plan",
-                data=csv,
-                file_name=f"fitness_plan_{name}_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
-            
-            st.success("Plan generated successfully! Good luck on your fitness journey! 🌟")
-            
-            # Show previous calculations if any exist
-            if len(st.session_state.previous_calculations) > 1:
-                st.subheader("📊 Previous Calculations")
-                prev_calc_df = pd.DataFrame(st.session_state.previous_calculations)
-                st.dataframe(prev_calc_df)
+        except Exception as e:
+            st.error(f"Error generating plan: {str(e)}")
+            calories, diet_plan, exercise_plan = tdee, "Error generating diet plan.", "Error generating exercise plan."
+        
+        # Store calculation in session state
+        calculation = {
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'name': name,
+            'bmr': bmr,
+            'tdee': tdee,
+            'goal': goals,
+            'calories': calories
+        }
+        st.session_state.previous_calculations.append(calculation)
+        
+        # Display Results
+        st.header(f"👋 Hello, {name}!")
+        
+        # Create three columns for displaying results
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("BMR", f"{bmr:.0f} kcal/day")
+        with col2:
+            st.metric("TDEE", f"{tdee:.0f} kcal/day")
+        with col3:
+            st.metric("Target Calories", f"{calories:.0f} kcal/day")
+        
+        # Display detailed plans
+        st.subheader("🍽️ Diet Plan")
+        st.markdown(diet_plan)
+        
+        st.subheader("💪 Exercise Plan")
+        st.markdown(exercise_plan)
+        
+        st.subheader("😴 Sleep & Meal Schedule")
+        st.write(f"- Recommended sleep: {sleep_hours} hours per night")
+        st.write(f"- Planned meals: {meals_per_day} per day")
+        
+        # Create download data
+        plan_data = create_download_data(
+            user_data={'name': name, 'age': age, 'gender': gender, 'height': height, 
+                      'weight': weight, 'activity_level': activity_level, 'goals': goals},
+            calculations={'bmr': bmr, 'tdee': tdee, 'calories': calories},
+            plans={'diet': diet_plan, 'exercise': exercise_plan}
+        )
+        
+        # Flatten the nested sections into a single CSV record
+        flat_items = [item for section in plan_data.values() for item in section.items()]
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(key for key, _ in flat_items)
+        writer.writerow(value for _, value in flat_items)
+        csv_bytes = buf.getvalue().encode('utf-8')
+        
+        st.download_button(
+            label="📥 Download Your Plan",
+            data=csv_bytes,
+            file_name=f"fitness_plan_{name}_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv"
+        )
+        
+        st.success("Plan generated successfully! Good luck on your fitness journey! 🌟")
+        
+        # Show previous calculations if any exist
+        if len(st.session_state.previous_calculations) > 1:
+            st.subheader("📊 Previous Calculations")
+            prev_calc_df = _history_df(st.session_state.previous_calculations)
+            st.dataframe(prev_calc_df)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
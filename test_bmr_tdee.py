@@ -0,0 +1,60 @@
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("streamlit")
+
+import test2
+
+# (weight, height, age, gender, activity_level, expected BMR, expected TDEE)
+# Expected values come from the original Mifflin-St Jeor formula in the app.
+BASELINE_ROWS = [
+    (70, 170.0, 25, 'Male', 'Sedentary', 1642.5, 1971.0),
+    (60, 160.0, 30, 'Female', 'Very Active', 1289.0, 2223.525),
+    (95.5, 188.2, 47, 'Male', 'Extremely Active', 1901.25, 3612.375),
+]
+
+
+def _batch_inputs(rows):
+    return (
+        [row[0] for row in rows],
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+        [row[3] == 'Male' for row in rows],
+        [test2._ACTIVITY_MULT[row[4]] for row in rows],
+    )
+
+
+@pytest.fixture(params=["numba", "python"])
+def batch_backend(request, monkeypatch):
+    """Run batch tests against the compiled loop and the plain-Python fallback."""
+    if request.param == "numba":
+        pytest.importorskip("numba")
+    else:
+        monkeypatch.setitem(sys.modules, "numba", None)
+    test2._bmr_tdee_fill.cache_clear()
+    yield request.param
+    test2._bmr_tdee_fill.cache_clear()
+
+
+def test_calculate_bmr_tdee_matches_baseline():
+    for weight, height, age, gender, activity, bmr, tdee in BASELINE_ROWS:
+        assert test2.calculate_bmr_tdee(weight, height, age, gender, activity) == pytest.approx((bmr, tdee))
+
+
+def test_batch_matches_calculate_bmr_tdee(batch_backend):
+    bmr, tdee = test2._bmr_tdee_vec(*_batch_inputs(BASELINE_ROWS))
+    for i, (weight, height, age, gender, activity, exp_bmr, exp_tdee) in enumerate(BASELINE_ROWS):
+        assert (bmr[i], tdee[i]) == test2.calculate_bmr_tdee(weight, height, age, gender, activity)
+        assert (bmr[i], tdee[i]) == pytest.approx((exp_bmr, exp_tdee))
+
+
+def test_batch_rejects_mismatched_lengths(batch_backend):
+    with pytest.raises(ValueError):
+        test2._bmr_tdee_vec([70, 80], [170], [25], [True], [1.2])
+
+
+def test_batch_rejects_non_1d_inputs(batch_backend):
+    with pytest.raises(ValueError):
+        test2._bmr_tdee_vec([[70]], [[170]], [[25]], [[True]], [[1.2]])